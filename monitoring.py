@@ -51,11 +51,30 @@ tts_latency = Histogram(
     buckets=[0.1, 0.5, 1, 2, 5, 10, 30]
 )
 
+request_duration = Histogram(
+    'http_request_duration_seconds',
+    'Time spent handling HTTP requests',
+    ['path']
+)
+
+# Routes with a job id are collapsed to their template to keep label cardinality bounded
+_KNOWN_PATHS = {'/', '/health', '/convert', '/metrics'}
+_JOB_ROUTES = ('/status/', '/download/')
+
+def _normalize_path(path: str) -> str:
+    """Map a request path to a fixed route label"""
+    if path in _KNOWN_PATHS:
+        return path
+    for prefix in _JOB_ROUTES:
+        if path.startswith(prefix):
+            return prefix + '{job_id}'
+    return 'other'
+
 def monitor_conversion(func):
     """Decorator to monitor conversion functions"""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             result = func(*args, **kwargs)
@@ -65,7 +84,7 @@ def monitor_conversion(func):
             conversion_requests.labels(status='failed').inc()
             raise e
         finally:
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             conversion_duration.observe(duration)
     
     return wrapper
@@ -86,14 +105,17 @@ class MetricsMiddleware:
     """FastAPI middleware for request metrics"""
     
     async def __call__(self, request, call_next):
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         response = await call_next(request)
         
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         
         # Record request duration
-        conversion_duration.observe(duration)
+        path = request.url.path
+        request_duration.labels(path=_normalize_path(path)).observe(duration)
+        if path.startswith('/convert'):
+            conversion_duration.observe(duration)
         
         # Add metrics headers
         response.headers['X-Processing-Time'] = str(duration)
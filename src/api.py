@@ -5,14 +5,22 @@ from pydantic import BaseModel
 from typing import Optional, Dict, Any
 import uuid
 import os
+import shutil
+import asyncio
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from io import StringIO
+
+import pandas as pd
 
 from src.pdf_processor.structure_analyzer import PaperStructureAnalyzer
-from src.equation_handler.latex_to_speech import EquationToSpeech
+from src.equation_handler.latex_to_speech import convert_equations, init_equation_worker
 from src.table_handler.table_summarizer import TableSummarizer
 from src.tts_engine.tts_audiogeenrator import AudioGenerator
 from src.utils.evaluation_metrics import ModelEvaluator
+from src.utils.job_store import JobStore
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -41,13 +49,60 @@ with open("config.yaml", "r") as f:
 
 # Initialize components
 structure_analyzer = PaperStructureAnalyzer(config.get("pdf_processor", {}))
-equation_converter = EquationToSpeech()
 table_summarizer = TableSummarizer(config.get("table_handler", {}))
 audio_generator = AudioGenerator(config.get("tts_engine", {}))
 evaluator = ModelEvaluator(config.get("evaluation", {}))
 
-# Store job statuses
-jobs = {}
+# Worker count for per-equation and per-table processing
+MAX_WORKERS = config.get("processing", {}).get("max_workers") or os.cpu_count()
+
+# Pools shared by all jobs; equation workers are long-lived so their caches stay warm
+# Workers come from a forkserver, never forked from this already-threaded process
+equation_pool = ProcessPoolExecutor(
+    max_workers=MAX_WORKERS,
+    mp_context=multiprocessing.get_context(
+        'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    ),
+    initializer=init_equation_worker
+)
+table_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+
+# Cap on concurrent TTS chunk syntheses across all jobs (bounds GPU memory)
+tts_semaphore = asyncio.Semaphore(config.get("processing", {}).get("tts_concurrency", 4))
+
+# Store job statuses in Redis so every worker process sees the same jobs
+job_store = JobStore(config.get("redis", {}))
+
+# Uploads and downloads are copied to disk in chunks of this size
+COPY_CHUNK_SIZE = 1 << 20
+
+def _save_upload(source, file_path: str):
+    """Stream an uploaded file object to disk without buffering it whole"""
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(source, f, length=COPY_CHUNK_SIZE)
+
+def _download_to_file(url: str, file_path: str):
+    """Stream a remote paper to disk chunk by chunk"""
+    import requests
+    with requests.get(url, stream=True) as response:
+        with open(file_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=COPY_CHUNK_SIZE):
+                f.write(chunk)
+
+def _summarize_table_text(table: Dict) -> str:
+    """Summarize one extracted table, falling back to noting where it was found"""
+    # Convert table text to DataFrame (simplified)
+    try:
+        df = pd.read_csv(StringIO(table["text"]), sep=r"\s+")
+        summary = table_summarizer.summarize_table(df)
+        return f"Table summary: {summary['narrative_summary']}"
+    except:
+        return f"Table found on page {table['page']}"
+
+async def _generate_audio_chunk(text: str, voice_params: Dict):
+    """Synthesize one text chunk off the event loop"""
+    async with tts_semaphore:
+        return await asyncio.to_thread(audio_generator.generate_audio, text, voice_params)
 
 class ConversionRequest(BaseModel):
     """Request model for paper conversion"""
@@ -99,25 +154,20 @@ async def convert_paper(
     if file:
         # Handle file upload
         file_path = f"/tmp/{job_id}_{file.filename}"
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        await asyncio.to_thread(_save_upload, file.file, file_path)
     elif request and request.paper_url:
         # Handle URL - download file
-        import requests
         file_path = f"/tmp/{job_id}_paper.pdf"
-        response = requests.get(request.paper_url)
-        with open(file_path, "wb") as f:
-            f.write(response.content)
+        await asyncio.to_thread(_download_to_file, request.paper_url, file_path)
     else:
         raise HTTPException(status_code=400, detail="Either file or paper_url must be provided")
     
     # Initialize job status
-    jobs[job_id] = {
+    await job_store.set(job_id, {
         "status": "processing",
         "progress": 0,
         "created_at": datetime.now().isoformat()
-    }
+    })
     
     # Start background processing
     background_tasks.add_task(
@@ -138,19 +188,19 @@ async def convert_paper(
 @app.get("/status/{job_id}")
 async def get_status(job_id: str):
     """Get job status"""
-    if job_id not in jobs:
+    job = await job_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return jobs[job_id]
+    return job
 
 @app.get("/download/{job_id}")
 async def download_audio(job_id: str):
     """Download converted audio file"""
-    if job_id not in jobs:
+    job = await job_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = jobs[job_id]
-    
     if job["status"] != "completed":
         raise HTTPException(status_code=400, detail="Job not completed yet")
     
@@ -173,12 +223,13 @@ async def process_paper(
 ):
     """Background task to process paper"""
     try:
-        jobs[job_id]["progress"] = 10
+        await job_store.update(job_id, {"progress": 10})
         
         # Step 1: Analyze paper structure
         logger.info(f"Analyzing paper structure for job {job_id}")
-        structure = structure_analyzer.analyze_paper(file_path)
-        jobs[job_id]["progress"] = 30
+        # Page analysis runs its own process pool; wait for it off the event loop
+        structure = await asyncio.to_thread(structure_analyzer.analyze_paper, file_path)
+        await job_store.update(job_id, {"progress": 30})
         
         # Step 2: Process text content
         logger.info(f"Processing text content for job {job_id}")
@@ -190,30 +241,32 @@ async def process_paper(
             if structure["metadata"]["authors"]:
                 text_segments.append(f"Authors: {', '.join(structure['metadata']['authors'])}")
         
-        jobs[job_id]["progress"] = 40
+        await job_store.update(job_id, {"progress": 40})
         
         # Step 3: Convert equations to speech
         logger.info(f"Converting equations for job {job_id}")
-        for eq in structure["equations"]:
-            speech = equation_converter.equation_to_speech(eq["latex"])
-            text_segments.append(f"Equation: {speech}")
+        loop = asyncio.get_running_loop()
+        latex_equations = [eq["latex"] for eq in structure["equations"]]
+        if latex_equations:
+            # Sympy parsing is CPU-bound, so use processes, in batches to cut IPC;
+            # gather keeps paper order and the event loop stays free meanwhile
+            batch_size = max(1, len(latex_equations) // (MAX_WORKERS * 4))
+            batches = await asyncio.gather(*(
+                loop.run_in_executor(equation_pool, convert_equations, latex_equations[i:i + batch_size])
+                for i in range(0, len(latex_equations), batch_size)
+            ))
+            text_segments.extend(f"Equation: {speech}" for batch in batches for speech in batch)
         
-        jobs[job_id]["progress"] = 60
+        await job_store.update(job_id, {"progress": 60})
         
         # Step 4: Summarize tables
         logger.info(f"Summarizing tables for job {job_id}")
-        for table in structure["tables"]:
-            # Convert table text to DataFrame (simplified)
-            import pandas as pd
-            from io import StringIO
-            try:
-                df = pd.read_csv(StringIO(table["text"]), sep="\s+")
-                summary = table_summarizer.summarize_table(df)
-                text_segments.append(f"Table summary: {summary['narrative_summary']}")
-            except:
-                text_segments.append(f"Table found on page {table['page']}")
+        text_segments.extend(await asyncio.gather(*(
+            loop.run_in_executor(table_pool, _summarize_table_text, table)
+            for table in structure["tables"]
+        )))
         
-        jobs[job_id]["progress"] = 80
+        await job_store.update(job_id, {"progress": 80})
         
         # Step 5: Add section content
         for section in structure["sections"]:
@@ -223,14 +276,11 @@ async def process_paper(
         logger.info(f"Generating audio for job {job_id}")
         full_text = " ".join(text_segments)
         
-        # Split text into chunks for TTS
-        chunk_size = 500  # characters
-        text_chunks = [full_text[i:i+chunk_size] for i in range(0, len(full_text), chunk_size)]
-        
-        audio_segments = []
-        for chunk in text_chunks:
-            audio = audio_generator.generate_audio(chunk, voice_params)
-            audio_segments.append(audio)
+        # Split text into sentence-aligned chunks and synthesize them concurrently
+        text_chunks = audio_generator.split_text(full_text, max_chars=500)
+        audio_segments = await asyncio.gather(
+            *(_generate_audio_chunk(chunk, voice_params) for chunk in text_chunks)
+        )
         
         # Concatenate audio segments
         final_audio = audio_generator.concatenate_audio_segments(audio_segments)
@@ -240,20 +290,20 @@ async def process_paper(
         with open(audio_path, "wb") as f:
             f.write(final_audio.getvalue())
         
-        jobs[job_id]["progress"] = 95
+        await job_store.update(job_id, {"progress": 95})
         
         # Step 7: Evaluate if requested
         if evaluate:
             logger.info(f"Evaluating results for job {job_id}")
-            metrics = evaluator.evaluate_paper_to_speech(
-                original_text=open(file_path, 'rb').read().decode('utf-8', errors='ignore'),
+            metrics = await evaluator.evaluate_paper_to_speech_async(
+                original_text=structure["full_text"],
                 generated_text=full_text,
                 audio_file=audio_path
             )
-            jobs[job_id]["metrics"] = metrics
+            await job_store.update(job_id, {"metrics": metrics})
         
         # Update job status
-        jobs[job_id].update({
+        await job_store.update(job_id, {
             "status": "completed",
             "progress": 100,
             "audio_path": audio_path,
@@ -264,7 +314,7 @@ async def process_paper(
         
     except Exception as e:
         logger.error(f"Error processing job {job_id}: {str(e)}")
-        jobs[job_id].update({
+        await job_store.update(job_id, {
             "status": "failed",
             "error": str(e),
             "failed_at": datetime.now().isoformat()
@@ -275,6 +325,12 @@ async def process_paper(
         if os.path.exists(file_path):
             os.remove(file_path)
 
+@app.on_event("shutdown")
+def shutdown_pools():
+    """Stop the shared worker pools"""
+    equation_pool.shutdown(wait=False, cancel_futures=True)
+    table_pool.shutdown(wait=False, cancel_futures=True)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
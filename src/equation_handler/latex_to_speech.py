@@ -1,9 +1,74 @@
 import sympy
 from sympy.parsing.latex import parse_latex
+import functools
 import re
 from typing import Dict, List
 import logging
 
+try:
+    import ahocorasick
+except ImportError:  # optional accelerator, falls back to a regex alternation
+    ahocorasick = None
+
+# Patterns for the equation hot path, compiled once at import
+_WS = re.compile(r'\s+')
+_LEFT_RIGHT = re.compile(r'\\left|\\right')
+_FRAC = re.compile(r'\\frac\{([^}]+)\}\{([^}]+)\}')
+_SUP_BRACED = re.compile(r'\^\{([^}]+)\}')
+_SUP_SINGLE = re.compile(r'\^(\w)')
+_SUB_BRACED = re.compile(r'\_\{([^}]+)\}')
+_SUB_SINGLE = re.compile(r'\_(\w)')
+
+# Equations sympy's LaTeX parser can plausibly handle; anything else goes
+# straight to pattern conversion instead of raising inside parse_latex
+_SYMPY_SAFE = re.compile(r'^[\w\d\s\+\-\*/\^\_\(\)\.=\\{}]+$')
+_SYMPY_UNSUPPORTED = re.compile(r'\\(?:begin|end|math[a-z]+|text[a-z]*|operatorname)\b')
+
+class _MultiReplace:
+    """Replaces many literal substrings in a single left-to-right pass"""
+    
+    def __init__(self, replacements: Dict[str, str]):
+        self.replacements = replacements
+        self._automaton = None
+        self._pattern = None
+        
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for key, replacement in replacements.items():
+                self._automaton.add_word(key, (len(key), replacement))
+            self._automaton.make_automaton()
+        else:
+            # Longest key first so the alternation prefers the longest match
+            self._pattern = re.compile('|'.join(
+                map(re.escape, sorted(replacements, key=len, reverse=True))
+            ))
+    
+    def __call__(self, text: str) -> str:
+        if self._automaton is None:
+            return self._pattern.sub(lambda m: self.replacements[m.group(0)], text)
+        
+        # Stitch the output from slices between leftmost-longest matches
+        parts = []
+        last = 0
+        for end, (length, replacement) in self._automaton.iter_long(text):
+            parts.append(text[last:end - length + 1])
+            parts.append(replacement)
+            last = end + 1
+        parts.append(text[last:])
+        
+        return ''.join(parts)
+
+# Operator words for sympy's string form; '**' must win over '*'
+_SYMPY_REPLACE = _MultiReplace({
+    '**': ' to the power of ',
+    '*': ' times ',
+    '/': ' divided by ',
+    '+': ' plus ',
+    '-': ' minus ',
+    '=': ' equals ',
+    'sqrt': 'square root of '
+})
+
 class EquationToSpeech:
     """Converts LaTeX equations to natural language speech"""
     
@@ -28,6 +93,21 @@ class EquationToSpeech:
             '\\mu': ' mu ',
             '\\sigma': ' sigma '
         }
+        
+        # All commands are replaced in one pass over the equation
+        self._speech_replace = _MultiReplace(self.speech_patterns)
+        
+        # Load the antlr-backed parser now rather than on the first equation
+        try:
+            parse_latex('x')
+            self.use_sympy = True
+        except Exception as e:
+            self.logger.warning(f"Sympy LaTeX parsing unavailable: {e}, using pattern-based conversion")
+            self.use_sympy = False
+        
+        # Per-instance memo of conversions, since papers repeat equations; a
+        # class-level lru_cache would be keyed on self and keep instances alive
+        self._converted = functools.lru_cache(maxsize=4096)(self._convert_cleaned)
     
     def equation_to_speech(self, latex_eq: str) -> str:
         """
@@ -43,27 +123,40 @@ class EquationToSpeech:
             # Clean and normalize LaTeX
             cleaned_eq = self._clean_latex(latex_eq)
             
-            # Try symbolic parsing for complex equations
-            try:
-                expr = parse_latex(cleaned_eq)
-                description = self._parse_sympy_expression(expr)
-            except:
-                # Fallback to pattern-based conversion
-                description = self._pattern_based_conversion(cleaned_eq)
-            
-            return description
+            return self._converted(cleaned_eq)
             
         except Exception as e:
             self.logger.error(f"Error converting equation: {e}")
             return f"Mathematical expression: {latex_eq}"
     
+    def _convert_cleaned(self, cleaned_eq: str) -> str:
+        """Convert a cleaned equation"""
+        if not self._is_sympy_parsable(cleaned_eq):
+            return self._pattern_based_conversion(cleaned_eq)
+        
+        # Try symbolic parsing for complex equations
+        try:
+            expr = parse_latex(cleaned_eq)
+            description = self._parse_sympy_expression(expr)
+        except:
+            # Fallback to pattern-based conversion
+            description = self._pattern_based_conversion(cleaned_eq)
+        
+        return description
+    
+    def _is_sympy_parsable(self, latex: str) -> bool:
+        """Cheap pre-check so known-unparsable equations skip the exception path"""
+        return (self.use_sympy
+                and _SYMPY_SAFE.match(latex) is not None
+                and _SYMPY_UNSUPPORTED.search(latex) is None)
+    
     def _clean_latex(self, latex: str) -> str:
         """Clean and normalize LaTeX string"""
         # Remove extra spaces
-        latex = re.sub(r'\s+', ' ', latex.strip())
+        latex = _WS.sub(' ', latex.strip())
         
         # Handle common LaTeX patterns
-        latex = re.sub(r'\\left|\\right', '', latex)
+        latex = _LEFT_RIGHT.sub('', latex)
         
         return latex
     
@@ -73,28 +166,14 @@ class EquationToSpeech:
         expr_str = str(expr)
         
         # Replace operators with words
-        replacements = {
-            '**': ' to the power of ',
-            '*': ' times ',
-            '/': ' divided by ',
-            '+': ' plus ',
-            '-': ' minus ',
-            '=': ' equals ',
-            'sqrt': 'square root of '
-        }
-        
-        for op, replacement in replacements.items():
-            expr_str = expr_str.replace(op, replacement)
+        expr_str = _SYMPY_REPLACE(expr_str)
         
         return expr_str
     
     def _pattern_based_conversion(self, latex: str) -> str:
         """Convert LaTeX to speech using pattern matching"""
-        speech = latex
-        
         # Replace LaTeX commands with speech equivalents
-        for cmd, speech_form in self.speech_patterns.items():
-            speech = speech.replace(cmd, speech_form)
+        speech = self._speech_replace(latex)
         
         # Handle fractions specially
         speech = self._handle_fractions(speech)
@@ -103,29 +182,38 @@ class EquationToSpeech:
         speech = self._handle_superscripts_subscripts(speech)
         
         # Clean up multiple spaces
-        speech = re.sub(r'\s+', ' ', speech)
+        speech = _WS.sub(' ', speech)
         
         return speech.strip()
     
     def _handle_fractions(self, text: str) -> str:
         """Handle fraction patterns"""
         # Find \frac{numerator}{denominator} patterns
-        fraction_pattern = r'\\frac\{([^}]+)\}\{([^}]+)\}'
-        
         def fraction_replacer(match):
             num, den = match.groups()
             return f" {num} divided by {den} "
         
-        return re.sub(fraction_pattern, fraction_replacer, text)
+        return _FRAC.sub(fraction_replacer, text)
     
     def _handle_superscripts_subscripts(self, text: str) -> str:
         """Handle superscripts and subscripts"""
         # Handle ^ for superscripts
-        text = re.sub(r'\^\{([^}]+)\}', r' to the power of \1 ', text)
-        text = re.sub(r'\^(\w)', r' to the power of \1 ', text)
+        text = _SUP_BRACED.sub(r' to the power of \1 ', text)
+        text = _SUP_SINGLE.sub(r' to the power of \1 ', text)
         
         # Handle _ for subscripts
-        text = re.sub(r'\_\{([^}]+)\}', r' sub \1 ', text)
-        text = re.sub(r'\_(\w)', r' sub \1 ', text)
+        text = _SUB_BRACED.sub(r' sub \1 ', text)
+        text = _SUB_SINGLE.sub(r' sub \1 ', text)
         
-        return text
\ No newline at end of file
+        return text
+# Per-process state for parallel conversion: each worker builds one converter
+# in init_equation_worker, so its equation cache persists across jobs
+_worker_converter = None
+
+def init_equation_worker():
+    global _worker_converter
+    _worker_converter = EquationToSpeech()
+
+def convert_equations(latex_eqs: List[str]) -> List[str]:
+    """Convert a batch of equations in a worker process"""
+    return [_worker_converter.equation_to_speech(latex_eq) for latex_eq in latex_eqs]
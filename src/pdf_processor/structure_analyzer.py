@@ -1,28 +1,60 @@
 import fitz  # PyMuPDF
+import multiprocessing
+import os
 import re
-from typing import Dict, List, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+try:
+    import re2 as _re  # linear-time DFA engine, no backtracking blow-ups on long pages
+except ImportError:
+    _re = re
+
+# Patterns applied to every page, compiled once at import
+# One alternation over display math, inline math, \[...\] and \(...\),
+# so each page is scanned once; whichever group matched holds the LaTeX
+_EQ_RE = _re.compile(r'(?s)\$\$(.+?)\$\$|\$(.+?)\$|\\\[(.+?)\\\]|\\\((.+?)\\\)')
+
+# Figure caption header; the caption runs until the next "Fig" or the end of
+# the page. RE2 has no lookahead, so that end is found with a second search.
+_FIGURE_RE = _re.compile(r'(?i)(?:Figure|Fig\.?)\s*(\d+)[:\.]\s*')
+_FIGURE_END_RE = _re.compile(r'(?i)Fig')
+
+# Page workers are started from a server process rather than forked from the
+# caller, which may already be running threads (API pools, TTS, torch)
+_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+# Pages sharing a layout template reuse their table regions
+_TABLE_REGION_CACHE_SIZE = 64
+
 class PaperStructureAnalyzer:
     """Analyzes research paper structure and extracts different elements"""
     
     def __init__(self, config: Dict = None):
         self.config = config or {}
         self.logger = logger
+        self._table_region_cache = OrderedDict()
 
-    def analyze_paper(self, pdf_path: str) -> Dict:
+    def analyze_paper(self, pdf: Union[str, bytes]) -> Dict:
         """
         Analyze paper and identify sections, equations, tables, figures
         
+        Args:
+            pdf: Path to the PDF, or its contents as bytes
+            
         Returns:
             Dict with structure information
         """
         try:
-            doc = fitz.open(pdf_path)
+            doc = _open_pdf(pdf)
             structure = {
                 'metadata': self._extract_metadata(doc),
                 'sections': [],
@@ -31,35 +63,57 @@ class PaperStructureAnalyzer:
                 'figures': [],
                 'citations': []
             }
+            page_texts = []
             
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text = page.get_text()
-                blocks = page.get_text("dict")["blocks"]
-                
-                # Identify sections based on formatting
-                sections = self._extract_sections(blocks)
-                structure['sections'].extend(sections)
-                
-                # Extract equations (look for LaTeX patterns)
-                equations = self._extract_equations(text, page_num)
-                structure['equations'].extend(equations)
-                
-                # Extract tables
-                tables = self._extract_tables(page)
-                structure['tables'].extend(tables)
-                
-                # Extract figures
-                figures = self._extract_figures(page, page_num)
-                structure['figures'].extend(figures)
+            for page in self._analyze_pages(doc, pdf):
+                page_texts.append(page['text'])
+                for key in ('sections', 'equations', 'tables', 'figures'):
+                    structure[key].extend(page[key])
                 
+            # Plain text of the whole paper, used as the evaluation reference
+            structure['full_text'] = "\n".join(page_texts)
+            
             doc.close()
             return structure
     
         except Exception as e:
-            self.logger.error(f"Error analyzing paper: {e}")
+            self.logger.exception(f"Error analyzing paper: {e}")
             raise
     
+    def _analyze_pages(self, doc, pdf: Union[str, bytes]) -> List[Dict]:
+        """Analyze every page, in worker processes when the paper has more than one"""
+        max_workers = self.config.get('max_workers') or min(os.cpu_count() or 1, 4)
+        max_workers = min(max_workers, len(doc))
+        
+        if max_workers <= 1:
+            return [self._analyze_page(doc[page_num], page_num) for page_num in range(len(doc))]
+        
+        # PyMuPDF holds the GIL while extracting, so use processes; map keeps page order
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=_MP_CONTEXT,
+            initializer=_init_page_worker,
+            initargs=(pdf, self.config)
+        ) as executor:
+            return list(executor.map(_analyze_page_in_worker, range(len(doc))))
+    
+    def _analyze_page(self, page, page_num: int) -> Dict:
+        """Extract sections, equations, tables and figures from a single page"""
+        text = page.get_text()
+        blocks = page.get_text("dict")["blocks"]
+        
+        return {
+            'text': text,
+            # Identify sections based on formatting
+            'sections': self._extract_sections(blocks),
+            # Extract equations (look for LaTeX patterns)
+            'equations': self._extract_equations(text, page_num),
+            # Extract tables
+            'tables': self._extract_tables(page, blocks),
+            # Extract figures
+            'figures': self._extract_figures(text, page_num)
+        }
+    
     def _extract_metadata(self, doc) -> Dict:
         """Extract paper metadata"""
         metadata = doc.metadata
@@ -81,32 +135,25 @@ class PaperStructureAnalyzer:
         """Extract mathematical equations"""
         equations = []
         
-        # Pattern for LaTeX equations
-        latex_patterns = [
-            r'\$\$(.*?)\$\$',  # Display math
-            r'\$(.*?)\$',       # Inline math
-            r'\\\[(.*?)\\\]',   # LaTeX display
-            r'\\\((.*?)\\\)'    # LaTeX inline
-        ]
-        
-        for pattern in latex_patterns:
-            matches = re.finditer(pattern, text, re.DOTALL)
-            for match in matches:
-                equations.append({
-                    'latex': match.group(1),
-                    'page': page_num,
-                    'position': match.span()
-                })
+        for match in _EQ_RE.finditer(text):
+            latex = next(group for group in match.groups() if group is not None)
+            equations.append({
+                'latex': latex,
+                'page': page_num,
+                'position': match.span()
+            })
         
         return equations
     
-    def _extract_tables(self, page) -> List[Dict]:
+    def _extract_tables(self, page, blocks: List[Dict]) -> List[Dict]:
         """Extract table structures"""
         tables = []
         
-        # Find table regions (look for grid-like structures)
-        text_blocks = page.get_text("dict")["blocks"]
-        potential_tables = self._identify_table_regions(text_blocks)
+        # Find table regions (look for grid-like structures). Region detection
+        # takes (x0, y0, x1, y1, text, block_no, block_type) tuples, built here
+        # from the page's "dict" blocks so no extra extraction pass is needed
+        text_blocks = [_block_tuple(b) for b in blocks]
+        potential_tables = self._cached_table_regions(text_blocks)
         
         for table_region in potential_tables:
             table_text = page.get_text("text", clip=table_region)
@@ -118,20 +165,70 @@ class PaperStructureAnalyzer:
         
         return tables
     
-    def _extract_figures(self, page, page_num: int) -> List[Dict]:
-        """Extract figure captions and descriptions"""
+    def _cached_table_regions(self, text_blocks: List[Tuple]) -> List:
+        """Table regions for a page, reused across pages with the same block layout"""
+        # Text block bboxes quantized to 5pt, so small jitter still hits the cache
+        layout_key = tuple(
+            (int(b[0]) // 5, int(b[1]) // 5, int(b[2]) // 5, int(b[3]) // 5)
+            for b in text_blocks if b[6] == 0
+        )
+        
+        cache = self._table_region_cache
+        if layout_key in cache:
+            cache.move_to_end(layout_key)
+            return cache[layout_key]
+        
+        regions = self._identify_table_regions(text_blocks)
+        cache[layout_key] = regions
+        if len(cache) > _TABLE_REGION_CACHE_SIZE:
+            cache.popitem(last=False)
+        
+        return regions
+    
+    def _extract_figures(self, text: str, page_num: int) -> List[Dict]:
+        """Extract figure captions and descriptions from the page text"""
         figures = []
         
         # Look for "Figure X:" or "Fig. X" patterns
-        text = page.get_text()
-        figure_pattern = r'(?:Figure|Fig\.?)\s*(\d+)[:\.]\s*(.*?)(?=(?:Figure|Fig\.?|\Z))'
-        
-        matches = re.finditer(figure_pattern, text, re.DOTALL | re.IGNORECASE)
-        for match in matches:
+        position = 0
+        while True:
+            match = _FIGURE_RE.search(text, position)
+            if match is None:
+                break
+            
+            caption_end = _FIGURE_END_RE.search(text, match.end())
+            position = caption_end.start() if caption_end else len(text)
             figures.append({
                 'number': match.group(1),
-                'caption': match.group(2).strip(),
+                'caption': text[match.end():position].strip(),
                 'page': page_num
             })
         
-        return figures
\ No newline at end of file
+        return figures
+
+def _block_tuple(block: Dict) -> Tuple:
+    """Convert a "dict" block to the tuple layout of page.get_text("blocks")"""
+    text = "\n".join(
+        "".join(span["text"] for span in line["spans"])
+        for line in block.get("lines", [])
+    )
+    return (*block["bbox"], text, block["number"], block["type"])
+
+def _open_pdf(pdf: Union[str, bytes]):
+    """Open a PDF from a path or from in-memory bytes"""
+    if isinstance(pdf, (bytes, bytearray)):
+        return fitz.open(stream=pdf, filetype='pdf')
+    return fitz.open(pdf)
+
+# Per-process state for parallel page analysis: each worker opens the
+# document once in _init_page_worker and reuses it for all its pages
+_worker_doc = None
+_worker_analyzer = None
+
+def _init_page_worker(pdf: Union[str, bytes], config: Dict):
+    global _worker_doc, _worker_analyzer
+    _worker_doc = _open_pdf(pdf)
+    _worker_analyzer = PaperStructureAnalyzer(config)
+
+def _analyze_page_in_worker(page_num: int) -> Dict:
+    return _worker_analyzer._analyze_page(_worker_doc[page_num], page_num)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from typing import Dict, List
 import logging
@@ -28,18 +29,17 @@ class TableSummarizer:
 
     def _extract_statistics(self, df: pd.DataFrame) -> Dict:
         stats = {}
-        for col in df.select_dtypes(include=['number']).columns:
-            stats[col] = {
-                'mean': df[col].mean(),
-                'median': df[col].median(),
-                'min': df[col].min(),
-                'max': df[col].max(),
-                'std': df[col].std()
-            }
+        numeric = df.select_dtypes(include=['number'])
+        if not numeric.columns.empty:
+            # One vectorized agg over exactly the statistics we report
+            stats.update(numeric.agg(['mean', 'median', 'min', 'max', 'std']).to_dict())
         for col in df.select_dtypes(include=['object']).columns:
+            # One hash aggregation gives both the unique count and the most
+            # common value; idxmax avoids sorting the counts
+            counts = df[col].value_counts(sort=False, dropna=True)
             stats[col] = {
-                'unique_values': df[col].nunique(),
-                'most_common': df[col].mode().iloc[0] if not df[col].mode().empty else None
+                'unique_values': counts.size,
+                'most_common': counts.idxmax() if counts.size else None
             }
         return stats
 
@@ -62,19 +62,41 @@ class TableSummarizer:
     def _extract_insights(self, df: pd.DataFrame) -> List[str]:
         insights = []
         numeric_cols = df.select_dtypes(include=['number']).columns
-        if len(numeric_cols) >= 2:
-            correlations = df[numeric_cols].corr()
-            for i in range(len(numeric_cols)):
-                for j in range(i+1, len(numeric_cols)):
-                    corr = correlations.iloc[i, j]
-                    if abs(corr) > 0.7:
-                        direction = "positive" if corr > 0 else "negative"
-                        insights.append(
-                            f"Strong {direction} correlation ({corr:.2f}) between "
-                            f"'{numeric_cols[i]}' and '{numeric_cols[j]}'."
-                        )
+        # Correlation is undefined with fewer than two rows
+        if len(numeric_cols) >= 2 and len(df) >= 2:
+            correlations = self._correlation_matrix(df[numeric_cols])
+            # Select strong pairs from the upper triangle in one vectorized pass
+            rows, cols = np.triu_indices_from(correlations, k=1)
+            values = correlations[rows, cols]
+            strong = np.abs(values) > 0.7
+            for i, j, corr in zip(rows[strong], cols[strong], values[strong]):
+                direction = "positive" if corr > 0 else "negative"
+                insights.append(
+                    f"Strong {direction} correlation ({corr:.2f}) between "
+                    f"'{numeric_cols[i]}' and '{numeric_cols[j]}'."
+                )
         return insights
 
+    def _correlation_matrix(self, numeric: pd.DataFrame) -> np.ndarray:
+        """Pearson correlations via one float32 GEMM on standardized columns"""
+        X = numeric.to_numpy(dtype=np.float64, copy=True)
+        if np.isnan(X).any():
+            # Missing values need pandas' pairwise-complete handling
+            return numeric.corr().to_numpy()
+        # Center and scale in float64: float32 leaves rounding residue in constant
+        # columns and loses small variations on large offsets
+        mean = X.mean(axis=0)
+        X -= mean
+        std = X.std(axis=0)
+        # Constant columns (std at rounding level) correlate with nothing
+        constant = std <= np.finfo(np.float64).eps * np.maximum(np.abs(mean), 1) * len(X)
+        std[constant] = 1
+        X /= std
+        X[:, constant] = 0
+        # Standardized values are O(1), so the GEMM itself is safe in float32
+        X = X.astype(np.float32)
+        return np.clip((X.T @ X) / len(X), -1, 1)
+
     def _fallback_summary(self, df: pd.DataFrame) -> Dict:
         return {
             'statistics': {},
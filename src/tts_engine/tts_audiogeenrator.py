@@ -1,12 +1,32 @@
-#import torch
+import torch
 from transformers import SpeechT5Processor, SpeechT5ForTextToSpeech, SpeechT5HifiGan
 from gtts import gTTS
+from nltk.tokenize.punkt import PunktSentenceTokenizer
 import io
+import textwrap
+import threading
+import wave
 import numpy as np
-from typing import Dict, Optional, BinaryIO
+from typing import Dict, List, Optional, BinaryIO
 import logging
 import soundfile as sf
 
+# Untrained Punkt works without downloading the nltk data package
+_SENTENCE_TOKENIZER = PunktSentenceTokenizer()
+
+def _make_beep(sample_rate: int = 22050, duration: float = 1.0, frequency: int = 440) -> bytes:
+    """Serialize a simple beep as WAV bytes"""
+    t = np.linspace(0, duration, int(sample_rate * duration))
+    beep = np.sin(2 * np.pi * frequency * t)
+    beep = (beep * 32767).astype(np.int16)
+    
+    audio_bytes = io.BytesIO()
+    sf.write(audio_bytes, beep, sample_rate, format='wav')
+    return audio_bytes.getvalue()
+
+# The fallback beep never changes, so it is built once at import
+_BEEP_BYTES = _make_beep()
+
 class AudioGenerator:
     """Generates high-quality speech from processed text"""
     
@@ -16,6 +36,8 @@ class AudioGenerator:
         
         # Initialize TTS models
         self.use_neural = config.get('use_neural_tts', False)
+        # Pinned host buffers for device-to-host copies, one per synthesis thread
+        self._host_buffers = threading.local()
         
         if self.use_neural:
             try:
@@ -23,17 +45,48 @@ class AudioGenerator:
                 self.model = SpeechT5ForTextToSpeech.from_pretrained("microsoft/speecht5_tts")
                 self.vocoder = SpeechT5HifiGan.from_pretrained("microsoft/speecht5_hifigan")
                 
-                # Load speaker embeddings
-                self.speaker_embeddings = torch.randn((1, 512))  # Random voice
-                
                 self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
                 self.model.to(self.device)
                 self.vocoder.to(self.device)
                 
+                # Half precision on GPU; CPU stays in FP32
+                self.dtype = torch.float32
+                if self.device.type == 'cuda':
+                    self.dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+                    self.model.to(self.dtype)
+                    self.vocoder.to(self.dtype)
+                
+                # Load speaker embeddings once, directly on the device
+                self.speaker_embeddings = torch.randn((1, 512), device=self.device, dtype=self.dtype)  # Random voice
+                
             except Exception as e:
                 self.logger.warning(f"Neural TTS failed to load: {e}, falling back to gTTS")
                 self.use_neural = False
     
+    def split_text(self, text: str, max_chars: int = 500) -> List[str]:
+        """
+        Split text into chunks for synthesis, breaking at sentence boundaries
+        
+        Sentences are packed greedily into chunks of at most max_chars;
+        a sentence longer than that is wrapped at word boundaries.
+        """
+        chunks = []
+        current = ""
+        
+        for sentence in _SENTENCE_TOKENIZER.tokenize(text):
+            pieces = textwrap.wrap(sentence, max_chars) if len(sentence) > max_chars else [sentence]
+            for piece in pieces:
+                if current and len(current) + 1 + len(piece) > max_chars:
+                    chunks.append(current)
+                    current = piece
+                else:
+                    current = f"{current} {piece}" if current else piece
+        
+        if current:
+            chunks.append(current)
+        
+        return chunks
+    
     def generate_audio(self, text: str, voice_params: Optional[Dict] = None) -> BinaryIO:
         """
         Generate audio from text
@@ -46,7 +99,7 @@ class AudioGenerator:
             Audio file as bytes buffer
         """
         try:
-            if self.use_neural and len(text) < 500:  # Limit neural TTS to shorter texts
+            if self.use_neural:
                 return self._generate_neural_audio(text, voice_params)
             else:
                 return self._generate_gtts_audio(text, voice_params)
@@ -57,24 +110,50 @@ class AudioGenerator:
     
     def _generate_neural_audio(self, text: str, voice_params: Optional[Dict]) -> BinaryIO:
         """Generate audio using neural TTS (SpeechT5)"""
-        # Process input
-        inputs = self.processor(text=text, return_tensors="pt").to(self.device)
+        # Long input is synthesized chunk by chunk instead of falling back to gTTS
+        chunks = self.split_text(text)
         
-        # Generate speech
+        # Tokenize all chunks in one call
+        inputs = self.processor(text=chunks, padding=True, return_tensors="pt")
+        input_ids = inputs["input_ids"].to(self.device, non_blocking=True)
+        lengths = inputs["attention_mask"].sum(dim=1).tolist()
+        
+        # Generate speech; generate_speech takes one unpadded sequence at a time
+        speech_parts = []
+        # The model, vocoder and speaker embeddings are already in self.dtype
         with torch.no_grad():
-            speech = self.model.generate_speech(
-                inputs["input_ids"], 
-                self.speaker_embeddings.to(self.device),
-                vocoder=self.vocoder
-            )
+            for ids, length in zip(input_ids, lengths):
+                speech_parts.append(self.model.generate_speech(
+                    ids[:length].unsqueeze(0), 
+                    self.speaker_embeddings,
+                    vocoder=self.vocoder
+                ))
+        speech = torch.cat(speech_parts)
         
-        # Convert to audio bytes
+        # Convert to audio bytes as 16-bit PCM, half the size of float WAV
         audio_bytes = io.BytesIO()
-        sf.write(audio_bytes, speech.cpu().numpy(), 16000, format='wav')
+        sf.write(audio_bytes, self._speech_to_numpy(speech), 16000, format='wav', subtype='PCM_16')
         audio_bytes.seek(0)
         
         return audio_bytes
     
+    def _speech_to_numpy(self, speech: torch.Tensor) -> np.ndarray:
+        """Copy a generated waveform to host memory as float32 (numpy has no bfloat16)"""
+        if self.device.type != 'cuda':
+            return speech.float().numpy()
+        
+        # Reuse a pinned buffer, grown on demand, so the copy is a direct DMA transfer
+        n = speech.numel()
+        host = getattr(self._host_buffers, 'buffer', None)
+        if host is None or host.numel() < n:
+            host = torch.empty(n, dtype=torch.float32, pin_memory=True)
+            self._host_buffers.buffer = host
+        
+        host[:n].copy_(speech, non_blocking=True)
+        torch.cuda.current_stream(self.device).synchronize()
+        # A view into the buffer; the caller encodes it before this thread synthesizes again
+        return host[:n].numpy()
+    
     def _generate_gtts_audio(self, text: str, voice_params: Optional[Dict]) -> BinaryIO:
         """Generate audio using Google TTS"""
         # Configure TTS
@@ -94,34 +173,77 @@ class AudioGenerator:
     
     def _generate_fallback_audio(self, text: str) -> BinaryIO:
         """Generate simple beep as fallback"""
-        # Generate a simple beep
-        sample_rate = 22050
-        duration = 1.0
-        frequency = 440
+        return io.BytesIO(_BEEP_BYTES)
+    
+    def concatenate_audio_segments(self, segments: list) -> BinaryIO:
+        """Concatenate multiple audio segments"""
+        combined = self._concatenate_pcm_wav(segments)
+        if combined is not None:
+            return combined
         
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        beep = np.sin(2 * np.pi * frequency * t)
-        beep = (beep * 32767).astype(np.int16)
+        decoded = []
+        
+        for segment in segments:
+            segment.seek(0)
+            # Downmix to mono so mono and stereo segments can be joined
+            audio, sr = sf.read(segment, always_2d=True)
+            decoded.append((audio.mean(axis=1), sr))
+        
+        # Segments can differ in rate (neural, gTTS, the fallback beep), so
+        # bring them all to the highest rate before joining
+        target_sr = max(sr for _, sr in decoded)
+        combined = np.concatenate([
+            self._resample(audio, sr, target_sr) for audio, sr in decoded
+        ])
         
         audio_bytes = io.BytesIO()
-        sf.write(audio_bytes, beep, sample_rate, format='wav')
+        sf.write(audio_bytes, combined, target_sr, format='wav')
         audio_bytes.seek(0)
         
         return audio_bytes
     
-    def concatenate_audio_segments(self, segments: list) -> BinaryIO:
-        """Concatenate multiple audio segments"""
-        all_audio = []
+    def _resample(self, audio: np.ndarray, sr: int, target_sr: int) -> np.ndarray:
+        """Linearly resample a mono signal up to target_sr (never down, so no anti-aliasing is needed)"""
+        if sr == target_sr or len(audio) == 0:
+            return audio
         
-        for segment in segments:
-            segment.seek(0)
-            audio, sr = sf.read(segment)
-            all_audio.append(audio)
+        duration = len(audio) / sr
+        source_times = np.arange(len(audio)) / sr
+        target_times = np.arange(int(round(duration * target_sr))) / target_sr
+        return np.interp(target_times, source_times, audio)
+    
+    def _concatenate_pcm_wav(self, segments: list) -> Optional[BinaryIO]:
+        """
+        Join PCM WAV segments by copying their frames, without decoding
         
-        combined = np.concatenate(all_audio)
+        Returns None if any segment is not PCM WAV (e.g. gTTS MP3) or the
+        segments differ in channels, sample width or rate.
+        """
+        params = None
+        frames = []
+        
+        try:
+            for segment in segments:
+                segment.seek(0)
+                with wave.open(segment, 'rb') as reader:
+                    segment_params = reader.getparams()[:3]  # channels, width, rate
+                    if params is None:
+                        params = segment_params
+                    elif segment_params != params:
+                        return None
+                    frames.append(reader.readframes(reader.getnframes()))
+        except (wave.Error, EOFError):
+            return None
+        
+        if params is None:
+            return None
         
         audio_bytes = io.BytesIO()
-        sf.write(audio_bytes, combined, 16000, format='wav')
+        with wave.open(audio_bytes, 'wb') as writer:
+            writer.setnchannels(params[0])
+            writer.setsampwidth(params[1])
+            writer.setframerate(params[2])
+            writer.writeframes(b''.join(frames))
         audio_bytes.seek(0)
         
-        return audio_bytes
\ No newline at end of file
+        return audio_bytes
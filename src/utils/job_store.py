@@ -0,0 +1,34 @@
+import json
+from typing import Any, Dict, Optional
+
+from redis.asyncio import Redis
+
+class JobStore:
+    """Conversion job state shared by all API workers, kept in Redis"""
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.redis = Redis.from_url(
+            config.get('url', 'redis://localhost:6379/0'),
+            decode_responses=True
+        )
+        # Finished jobs expire on their own instead of accumulating in memory
+        self.ttl = config.get('job_ttl_seconds', 86400)
+
+    def _key(self, job_id: str) -> str:
+        return f"job:{job_id}"
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job record, or None if it doesn't exist or has expired"""
+        value = await self.redis.get(self._key(job_id))
+        return json.loads(value) if value is not None else None
+
+    async def set(self, job_id: str, job: Dict[str, Any]):
+        """Store a job record, resetting its TTL"""
+        await self.redis.set(self._key(job_id), json.dumps(job, default=str), ex=self.ttl)
+
+    async def update(self, job_id: str, fields: Dict[str, Any]):
+        """Merge fields into an existing job record"""
+        job = await self.get(job_id) or {}
+        job.update(fields)
+        await self.set(job_id, job)
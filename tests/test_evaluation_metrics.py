@@ -0,0 +1,74 @@
+import random
+import re
+
+import pytest
+
+for module in ('numpy', 'sklearn', 'jiwer', 'rouge', 'bert_score'):
+    pytest.importorskip(module)
+
+from src.utils.evaluation_metrics import ModelEvaluator
+
+
+@pytest.fixture
+def evaluator():
+    return ModelEvaluator({})
+
+
+def _identify_sections_reference(text):
+    """Line-by-line section detection as it was before the combined _SECTION_RE"""
+    section_patterns = [
+        r'^#{1,3}\s+(.*?)$',
+        r'^([A-Z][A-Z\s]+)$',
+        r'^(Abstract|Introduction|Methodology|Results|Discussion|Conclusion|References)$'
+    ]
+    sections = {}
+    for i, line in enumerate(text.split('\n')):
+        for pattern in section_patterns:
+            match = re.search(pattern, line.strip())
+            if match:
+                sections[match.group(1).strip()] = i
+    return sections
+
+
+def _random_document(rng):
+    pieces = ['#', '##', '###', '####', ' ', '\t', '\n', '\n', 'A', 'B', 'Z', 'a', 'x', '1', '.',
+              'Abstract', 'Introduction', 'Results', 'References', 'METHODS', 'Results and more']
+    return ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+
+
+def test_identify_sections_matches_line_by_line_reference(evaluator):
+    rng = random.Random(0)
+    for _ in range(5000):
+        text = _random_document(rng)
+        sections, names = evaluator._identify_sections(text)
+        assert sections == _identify_sections_reference(text), repr(text)
+        assert names == frozenset(sections)
+
+
+def test_identify_sections_records_heading_lines(evaluator):
+    text = "# Overview\nbody text\nINTRODUCTION\nmore text\n  Conclusion  "
+    sections, names = evaluator._identify_sections(text)
+    assert sections == {'Overview': 0, 'INTRODUCTION': 2, 'Conclusion': 4}
+    assert names == frozenset(sections)
+
+
+def test_structure_skips_intersection_when_sections_match(evaluator):
+    text = "Abstract\ntext\nResults\ntext"
+    result = evaluator._evaluate_structure(text, text)
+    assert result['section_preservation_rate'] == 1.0
+    assert sorted(result['preserved_sections']) == ['Abstract', 'Results']
+
+
+def test_equations_need_exact_match_not_containment(evaluator):
+    # Substring containment used to count 'x' as preserved inside 'x+y'
+    result = evaluator._evaluate_equations("$x$", "$x+y$")
+    assert result['preserved_equation_count'] == 0
+    assert result['accuracy'] == 0.0
+
+
+def test_equations_match_ignoring_whitespace(evaluator):
+    # Containment missed this, since 'a + b' is not a substring of 'a+b'
+    result = evaluator._evaluate_equations("$a + b$ and $c$", "$a+b$ then $ c $")
+    assert result['original_equation_count'] == 2
+    assert result['preserved_equation_count'] == 2
+    assert result['accuracy'] == 1.0
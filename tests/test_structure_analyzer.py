@@ -0,0 +1,86 @@
+import random
+import re
+
+import pytest
+
+pytest.importorskip('fitz')
+
+from src.pdf_processor.structure_analyzer import PaperStructureAnalyzer
+
+
+@pytest.fixture
+def analyzer():
+    return PaperStructureAnalyzer()
+
+
+def _extract_figures_reference(text, page_num):
+    """Figure captions via the original single lookahead pattern"""
+    figure_pattern = r'(?:Figure|Fig\.?)\s*(\d+)[:\.]\s*(.*?)(?=(?:Figure|Fig\.?|\Z))'
+    return [
+        {'number': match.group(1), 'caption': match.group(2).strip(), 'page': page_num}
+        for match in re.finditer(figure_pattern, text, re.DOTALL | re.IGNORECASE)
+    ]
+
+
+def _random_page(rng):
+    pieces = ['Figure', 'figure', 'Fig', 'FIG.', 'Fig.', ' ', '\n', '1', '23', ':', '.', 'x', 'caption']
+    return ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 30)))
+
+
+def test_extract_figures_matches_lookahead_reference(analyzer):
+    rng = random.Random(0)
+    for _ in range(5000):
+        text = _random_page(rng)
+        assert analyzer._extract_figures(text, 3) == _extract_figures_reference(text, 3), repr(text)
+
+
+def test_extract_figures_caption_runs_to_next_figure(analyzer):
+    text = "Figure 1: Model overview.\nFig. 2. Results per dataset"
+    assert analyzer._extract_figures(text, 0) == [
+        {'number': '1', 'caption': 'Model overview.', 'page': 0},
+        {'number': '2', 'caption': 'Results per dataset', 'page': 0},
+    ]
+
+
+def _extract_equations_reference(text, page_num):
+    """Equations via the original four separate passes"""
+    latex_patterns = [r'\$\$(.*?)\$\$', r'\$(.*?)\$', r'\\\[(.*?)\\\]', r'\\\((.*?)\\\)']
+    return [
+        {'latex': match.group(1), 'page': page_num, 'position': match.span()}
+        for pattern in latex_patterns
+        for match in re.finditer(pattern, text, re.DOTALL)
+    ]
+
+
+def test_extract_equations_drops_duplicates_and_empty_bodies(analyzer):
+    text = "$$a$$ and $b$"
+    # The separate inline pass also matched the '$$' delimiters as empty equations
+    assert [eq['latex'] for eq in _extract_equations_reference(text, 0)] == ['a', '', '', 'b']
+    assert analyzer._extract_equations(text, 0) == [
+        {'latex': 'a', 'page': 0, 'position': (0, 5)},
+        {'latex': 'b', 'page': 0, 'position': (10, 13)},
+    ]
+
+
+def test_extract_equations_rejects_empty_delimiters(analyzer):
+    text = "a $$ b"
+    assert [eq['latex'] for eq in _extract_equations_reference(text, 0)] == ['']
+    assert analyzer._extract_equations(text, 0) == []
+
+
+def test_extract_equations_in_text_order(analyzer):
+    text = r"\(y\) then $x$ then \[z\]"
+    assert [eq['latex'] for eq in _extract_equations_reference(text, 0)] == ['x', 'z', 'y']
+    assert [eq['latex'] for eq in analyzer._extract_equations(text, 0)] == ['y', 'x', 'z']
+
+
+def test_extract_equations_are_nonempty_and_disjoint(analyzer):
+    rng = random.Random(0)
+    pieces = ['$', '$$', '\\[', '\\]', '\\(', '\\)', 'x', ' ', '\n']
+    for _ in range(5000):
+        text = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+        end = 0
+        for eq in analyzer._extract_equations(text, 0):
+            start, stop = eq['position']
+            assert eq['latex'] and start >= end, repr(text)
+            end = stop
@@ -0,0 +1,71 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from src.table_handler.table_summarizer import TableSummarizer
+
+
+@pytest.fixture
+def summarizer():
+    return TableSummarizer({})
+
+
+def test_object_statistics_match_nunique_and_mode(summarizer):
+    df = pd.DataFrame({'model': ['bert', 'gpt', 'bert', None, 't5', 'bert']})
+    stats = summarizer._extract_statistics(df)['model']
+    assert stats['unique_values'] == df['model'].nunique()
+    assert stats['most_common'] == df['model'].mode().iloc[0] == 'bert'
+
+
+def test_object_statistics_break_ties_by_first_appearance(summarizer):
+    df = pd.DataFrame({'label': ['b', 'a', 'b', 'a']})
+    # mode() sorts the tied values and returned 'a'; idxmax over unsorted
+    # value_counts returns the tied value seen first
+    assert df['label'].mode().iloc[0] == 'a'
+    assert summarizer._extract_statistics(df)['label']['most_common'] == 'b'
+
+
+def test_correlation_matrix_matches_pandas(summarizer):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(50, 4)), columns=list('abcd'))
+    np.testing.assert_allclose(summarizer._correlation_matrix(df), df.corr().to_numpy(), atol=1e-5)
+
+
+def test_correlation_matrix_constant_column_is_zero_not_nan(summarizer):
+    df = pd.DataFrame({'x': [1.0, 2.0, 3.0, 4.0], 'y': [2.0, 4.1, 5.9, 8.2], 'c': [5.0] * 4})
+    # pandas leaves correlations with a zero-variance column undefined
+    assert df.corr()['c'].isna().all()
+    corr = summarizer._correlation_matrix(df)
+    np.testing.assert_array_equal(corr[2], np.zeros(3))
+    np.testing.assert_array_equal(corr[:, 2], np.zeros(3))
+    assert corr[0, 1] == pytest.approx(df['x'].corr(df['y']), abs=1e-5)
+
+
+def test_correlation_matrix_with_missing_values_uses_pandas(summarizer):
+    df = pd.DataFrame({'x': [1.0, 2.0, None, 4.0, 5.0], 'y': [1.0, 2.5, 3.0, None, 5.5]})
+    np.testing.assert_allclose(summarizer._correlation_matrix(df), df.corr().to_numpy())
+
+
+def test_insights_ignore_constant_columns(summarizer):
+    df = pd.DataFrame({'x': [1.0, 2.0, 3.0, 4.0], 'y': [2.0, 4.1, 5.9, 8.2], 'c': [5.0] * 4})
+    insights = summarizer._extract_insights(df)
+    assert len(insights) == 1
+    assert "'x' and 'y'" in insights[0]
+
+
+@pytest.mark.parametrize('value', [0.1, 0.7, 1 / 3, 123.456])
+def test_correlation_matrix_inexact_constant_columns_are_zero(summarizer, value):
+    # Rounding residue left by centering must not be scaled up into a correlation
+    df = pd.DataFrame({'acc': [0.7] * 7, 'dropout': [value] * 7, 'epoch': range(7)})
+    corr = summarizer._correlation_matrix(df)
+    np.testing.assert_array_equal(corr[:2], np.zeros((2, 3)))
+    np.testing.assert_array_equal(corr[:, :2], np.zeros((3, 2)))
+    assert summarizer._extract_insights(df) == []
+
+
+def test_correlation_matrix_large_offset_column(summarizer):
+    df = pd.DataFrame({'step': 1e8 + np.arange(7) * 1e-3, 'epoch': range(7)})
+    corr = summarizer._correlation_matrix(df)
+    np.testing.assert_allclose(corr, df.corr().to_numpy(), atol=1e-5)
+    assert np.abs(corr).max() <= 1